@@ -15,19 +15,83 @@ python convert_audio_batch.py -i "./audios" -o "./convertidos" -f wav --telephon
 
 # Si FFmpeg no está en PATH:
 python convert_audio_batch.py -i "./audios" -f wav -r 8000 -c 1 --overwrite --ffmpeg "C:/ffmpeg/bin/ffmpeg.exe"
+
+# Muchos clips cortos: 8 FFmpeg en paralelo, 20 archivos por invocación
+python convert_audio_batch.py -i "./audios" -f wav --telephony -j 8 --batch 20
 """
 
 import argparse
+import asyncio
+import itertools
 import os
 import shutil
 import subprocess
 import sys
+import time
+from collections.abc import Callable, Iterator
 from pathlib import Path
 
-SUPPORTED_INPUTS = {
+try:
+    import uvloop  # opcional: event loop más rápido
+except ImportError:
+    uvloop = None
+
+try:
+    from tqdm import tqdm  # opcional: barra de progreso
+except ImportError:
+    tqdm = None
+
+try:
+    import soundfile as sf  # opcionales: telefonía en proceso (--inproc)
+    import soxr
+except ImportError:
+    sf = soxr = None
+
+SUPPORTED_INPUTS = frozenset({
     ".mp3", ".wav", ".ogg", ".m4a", ".aac", ".flac", ".wma", ".aiff", ".aif", ".opus", ".caf"
+})
+
+# Argumentos de códec por extensión destino (WAV/AIFF: PCM 16-bit little-endian)
+CODEC_ARGS: dict[str, list[str]] = {
+    ".mp3":  ["-c:a", "libmp3lame"],
+    ".aac":  ["-c:a", "aac"],
+    ".m4a":  ["-c:a", "aac"],
+    ".opus": ["-c:a", "libopus"],
+    ".ogg":  ["-c:a", "libvorbis"],
+    ".flac": ["-c:a", "flac"],
+    ".wav":  ["-c:a", "pcm_s16le"],
+    ".aiff": ["-c:a", "pcm_s16le"],
+    ".aif":  ["-c:a", "pcm_s16le"],
 }
 
+# Nombre del códec (según ffprobe) que ya sirve tal cual para cada extensión destino
+COPY_CODECS = {
+    ".mp3":  "mp3",
+    ".aac":  "aac",
+    ".m4a":  "aac",
+    ".opus": "opus",
+    ".ogg":  "vorbis",
+    ".flac": "flac",
+    ".wav":  "pcm_s16le",
+}
+
+# Filtros de normalización por modo (--normalize-mode)
+NORMALIZE_FILTERS = {
+    # Normalización dinámica en streaming: barata, sin análisis previo
+    "fast": "dynaudnorm=f=200:g=15",
+    # Normalización EBU R128 (one-pass): más fiel, pero bastante más costosa
+    "ebu": "loudnorm=I=-16:LRA=11:TP=-1.5:linear=true",
+}
+
+# Formatos con pérdida en los que --bitrate tiene efecto
+BITRATE_EXTS = {".mp3", ".aac", ".m4a", ".opus", ".ogg"}
+
+# Máximo de stderr de FFmpeg que se guarda por tarea (con -loglevel error sobra)
+STDERR_LIMIT = 16 * 1024
+
+# Sin tqdm: segundos mínimos entre líneas de progreso
+PROGRESS_INTERVAL = 0.5
+
 def resolve_ffmpeg(ffmpeg_arg: str | None) -> str:
     """
     Devuelve la ruta al ejecutable de ffmpeg.
@@ -61,61 +125,299 @@ def resolve_ffmpeg(ffmpeg_arg: str | None) -> str:
     ]
     sys.exit("\n".join(msg))
 
+def ffmpeg_cache_file() -> Path:
+    """Archivo donde se recuerda el último FFmpeg verificado."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "convert_audio" / "ffmpeg_ok"
+
 def check_ffmpeg_available(ffmpeg_bin: str):
-    """Verifica que FFmpeg se pueda ejecutar."""
+    """
+    Verifica que FFmpeg se pueda ejecutar.
+    El resultado se cachea en disco por (ruta, mtime, tamaño, permisos): mientras
+    el ejecutable no cambie (ni pierda el permiso de ejecución), no se vuelve a
+    lanzar 'ffmpeg -version'.
+    """
+    try:
+        st = os.stat(ffmpeg_bin)
+        key = f"{ffmpeg_bin}:{st.st_mtime_ns}:{st.st_size}:{st.st_mode}"
+    except OSError:
+        key = None
+    cache = ffmpeg_cache_file()
+    if key is not None:
+        try:
+            if cache.read_text(encoding="utf-8") == key:
+                return
+        except OSError:
+            pass
+
     try:
         subprocess.run([ffmpeg_bin, "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
     except FileNotFoundError:
         sys.exit(f"[ERROR] No se puede ejecutar FFmpeg en: {ffmpeg_bin}")
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, PermissionError):
         sys.exit(f"[ERROR] FFmpeg parece estar corrupto o no es ejecutable: {ffmpeg_bin}")
 
-def build_ffmpeg_cmd(ffmpeg_bin: str, src: Path, dst: Path, args: argparse.Namespace) -> list[str]:
-    cmd = [
+    if key is not None:
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            cache.write_text(key, encoding="utf-8")
+        except OSError:
+            pass  # sin caché: se verificará de nuevo la próxima vez
+
+def resolve_ffprobe(ffmpeg_bin: str) -> str | None:
+    """
+    Busca ffprobe junto a ffmpeg y, si no está, en PATH.
+    Devuelve None si no existe (se desactiva la copia directa).
+    """
+    name = "ffprobe.exe" if os.name == "nt" else "ffprobe"
+    sibling = os.path.join(os.path.dirname(ffmpeg_bin), name)
+    if os.path.isfile(sibling):
+        return sibling
+    return shutil.which(name)
+
+def iter_audio(root: str, exclude: str | None = None):
+    """
+    Recorre root recursivamente con os.scandir (sin seguir symlinks de carpetas)
+    y devuelve las rutas de los archivos con extensión de audio soportada.
+    exclude: carpeta que no se recorre (la de salida, si está dentro de root),
+    para no volver a convertir lo que FFmpeg está escribiendo.
+    """
+    exclude = os.path.normcase(exclude) if exclude else None
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        if os.path.normcase(e.path) != exclude:
+                            stack.append(e.path)
+                        continue
+                    # Extensión directo del nombre (más barato que splitext/Path.suffix);
+                    # i > 0 descarta archivos ocultos sin extensión como ".mp3"
+                    name = e.name
+                    i = name.rfind(".")
+                    if i > 0 and name[i:].lower() in SUPPORTED_INPUTS and e.is_file():
+                        yield e.path
+        except OSError:
+            # Carpeta ilegible: se omite, igual que hacía rglob
+            continue
+
+def ffmpeg_head(ffmpeg_bin: str, args: argparse.Namespace) -> list[str]:
+    """Opciones globales comunes a todos los comandos FFmpeg."""
+    return [
         ffmpeg_bin, "-hide_banner", "-loglevel", "error",
         "-y" if args.overwrite else "-n",
-        "-i", str(src),
     ]
 
-    # Filtros de audio (solo normalización si se pidió)
-    afilters = []
-    if args.normalize:
-        # Normalización EBU R128 (one-pass)
-        afilters.append("loudnorm=I=-16:LRA=11:TP=-1.5:linear=true")
-
-    if afilters:
-        cmd += ["-af", ",".join(afilters)]
-
-    # Códec según extensión destino
-    ext = dst.suffix.lower()
-    if ext == ".mp3":
-        cmd += ["-c:a", "libmp3lame"]
-        if args.bitrate: cmd += ["-b:a", args.bitrate]
-    elif ext in (".aac", ".m4a"):
-        cmd += ["-c:a", "aac"]
-        if args.bitrate: cmd += ["-b:a", args.bitrate]
-    elif ext == ".opus":
-        cmd += ["-c:a", "libopus"]
-        if args.bitrate: cmd += ["-b:a", args.bitrate]
-    elif ext == ".ogg":
-        cmd += ["-c:a", "libvorbis"]
-        if args.bitrate: cmd += ["-b:a", args.bitrate]
-    elif ext == ".flac":
-        cmd += ["-c:a", "flac"]
-    elif ext in (".wav", ".aiff", ".aif"):
-        # PCM 16-bit little-endian (WAV estándar)
-        cmd += ["-c:a", "pcm_s16le"]
-    else:
-        # fallback genérico
-        if args.bitrate: cmd += ["-b:a", args.bitrate]
+def threads_opts(args: argparse.Namespace) -> list[str]:
+    """
+    -threads es una opción por archivo: hay que repetirla delante de cada -i
+    (decodificador) y en cada salida (codificador). Por defecto un hilo por
+    proceso: el paralelismo lo pone --jobs.
+    """
+    return ["-threads", str(getattr(args, "ffmpeg_threads", 1))]
 
-    # Sample rate y canales (sin filtros problemáticos)
-    if args.samplerate: cmd += ["-ar", str(args.samplerate)]
-    if args.channels:   cmd += ["-ac", str(args.channels)]
+def codec_opts(ext: str, bitrate: str | None) -> list[str]:
+    """Códec (y bitrate, si aplica) según la extensión destino."""
+    # Formatos desconocidos: sin -c:a, FFmpeg elige
+    codec_args = CODEC_ARGS.get(ext)
+    opts = list(codec_args) if codec_args is not None else []
+    if bitrate and (codec_args is None or ext in BITRATE_EXTS):
+        opts += ["-b:a", bitrate]
+    return opts
 
-    cmd += [str(dst)]
+def build_ffmpeg_cmd(head: list[str], in_opts: list[str], src: str, dst: str, out_opts: list[str]) -> list[str]:
+    """
+    head: opciones globales (ffmpeg_head); in_opts: opciones de cada entrada;
+    out_opts: opciones de salida ya armadas para el formato.
+    """
+    return [*head, *in_opts, "-i", src, *out_opts, dst]
+
+def build_ffmpeg_batch_cmd(head: list[str], in_opts: list[str], pairs: list[tuple[str, str]],
+                           out_opts: list[str]) -> list[str]:
+    """
+    Un solo FFmpeg para varios archivos con la misma extensión destino:
+    N entradas (-i) y N salidas, cada una con su -map. El arranque de FFmpeg
+    (carga de librerías, apertura de códecs) se paga una vez por lote.
+    """
+    cmd = list(head)
+    for src, _ in pairs:
+        cmd += [*in_opts, "-i", src]
+    for n, (_, dst) in enumerate(pairs):
+        cmd += ["-map", f"{n}:a:0", *out_opts, dst]
     return cmd
 
+async def run_job(sem: asyncio.Semaphore, cmd: list[str]) -> tuple[int, bytes]:
+    """Ejecuta un comando FFmpeg respetando el límite de concurrencia del semáforo."""
+    async with sem:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+        )
+        # Solo se conserva el inicio de stderr; el resto se descarta sin acumularlo
+        err = bytearray()
+        while chunk := await proc.stderr.read(64 * 1024):
+            if len(err) < STDERR_LIMIT:
+                err += chunk[:STDERR_LIMIT - len(err)]
+        return await proc.wait(), bytes(err)
+
+# Copia directa posible: ((códec, sample rate, canales) esperados, comando con -c:a copy).
+# Sample rate / canales None = cualquiera.
+CopyPlan = tuple[tuple[str, int | None, int | None], list[str]]
+# ([(src, dst), ...], comando, copia, sample rate si se convierte en proceso con --inproc)
+Job = tuple[list[tuple[str, str]], list[str], CopyPlan | None, int | None]
+
+def convert_inproc(src: str, dst: str, samplerate: int):
+    """
+    Convierte a WAV PCM 16-bit mono sin FFmpeg: lee con soundfile (libsndfile),
+    remuestrea con soxr y escribe. Lanza excepción si soundfile no puede leer
+    el origen (p. ej. AAC/M4A), para que se recurra a FFmpeg. Si la escritura
+    falla, borra el destino a medias (FFmpeg con -n no lo sobrescribiría).
+    """
+    data, sr = sf.read(src, dtype="int16", always_2d=True)
+    mono = data.mean(axis=1).astype("int16") if data.shape[1] > 1 else data[:, 0]
+    if sr != samplerate:
+        mono = soxr.resample(mono, sr, samplerate, quality="HQ").astype("int16")
+    try:
+        sf.write(dst, mono, samplerate, subtype="PCM_16")
+    except BaseException:
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+        raise
+
+def describe(src: str, dst: str) -> str:
+    """Texto de progreso de una tarea: 'nombre -> FORMATO  (destino)'."""
+    return f"{os.path.basename(src)} -> {os.path.splitext(dst)[1][1:].upper()}  ({dst})"
+
+def log_error(msg: str):
+    """Escribe un error en stderr sin romper la barra de progreso (si la hay)."""
+    if tqdm is not None:
+        tqdm.write(msg, file=sys.stderr)
+    else:
+        print(msg, file=sys.stderr)
+
+async def probe_audio(sem: asyncio.Semaphore, ffprobe_bin: str, src: str) -> tuple[str, int, int] | None:
+    """(códec, sample rate, canales) del primer stream de audio, o None si ffprobe falla."""
+    async with sem:
+        proc = await asyncio.create_subprocess_exec(
+            ffprobe_bin, "-v", "error", "-select_streams", "a:0",
+            "-show_entries", "stream=codec_name,sample_rate,channels", "-of", "default=nw=1", src,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+        out, _ = await proc.communicate()
+    if proc.returncode != 0:
+        return None
+    info = dict(line.partition("=")[::2] for line in out.decode("utf-8", "replace").splitlines())
+    try:
+        return info["codec_name"], int(info["sample_rate"]), int(info["channels"])
+    except (KeyError, ValueError):
+        return None
+
+def copy_matches(probed: tuple[str, int, int] | None, spec: tuple[str, int | None, int | None]) -> bool:
+    if probed is None:
+        return False
+    return all(want is None or want == got for want, got in zip(spec, probed))
+
+async def run_all(jobs: Iterator[Job], max_jobs: int, ffprobe_bin: str | None, stats: dict[str, int],
+                  single_cmd: Callable[[str, str], list[str]]):
+    """
+    Consume el generador de trabajos con una ventana deslizante: FFmpeg arranca
+    con los primeros archivos mientras el recorrido de carpetas sigue en curso.
+    stats["tasks"] es el total descubierto hasta el momento.
+    single_cmd arma el comando de un solo archivo, para reintentar los lotes que fallan.
+
+    Con tqdm instalado usa una barra; si no, imprime como mucho una línea
+    cada PROGRESS_INTERVAL segundos (y siempre la última).
+    """
+    sem = asyncio.Semaphore(max(1, max_jobs))
+    window = 2 * max(1, max_jobs)
+
+    async def one(pairs: list[tuple[str, str]], cmd: list[str], copy: CopyPlan | None, inproc: int | None):
+        """Devuelve una lista de resultados (pairs, returncode, stderr, excepción)."""
+        if inproc is not None:
+            # libsndfile/soxr liberan el GIL: los hilos sí corren en paralelo
+            try:
+                async with sem:
+                    await asyncio.to_thread(convert_inproc, *pairs[0], inproc)
+                return [(pairs, 0, b"", None)]
+            except RuntimeError:
+                pass  # libsndfile no soporta el formato (LibsndfileError): sigue con FFmpeg
+            except Exception as e:
+                src, dst = pairs[0]
+                log_error(f"  Error en proceso, se usa FFmpeg: {src} -> {dst} | {e!r}")
+        try:
+            if copy is not None and ffprobe_bin is not None:
+                spec, copy_cmd = copy
+                if copy_matches(await probe_audio(sem, ffprobe_bin, pairs[0][0]), spec):
+                    cmd = copy_cmd
+            returncode, err = await run_job(sem, cmd)
+        except Exception as e:
+            return [(pairs, None, b"", e)]
+        if returncode == 0 or len(pairs) == 1:
+            return [(pairs, returncode, err, None)]
+        # Lote fallido: FFmpeg corta todo el proceso por un solo archivo malo y
+        # deja salidas a medias. Se borran y se reintenta cada archivo por separado.
+        for _, dst in pairs:
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+        retried = await asyncio.gather(*(one([pair], single_cmd(*pair), None, None) for pair in pairs))
+        return [result for results in retried for result in results]
+
+    pending: set[asyncio.Task] = set()
+
+    def refill():
+        for job in itertools.islice(jobs, window - len(pending)):
+            pending.add(asyncio.create_task(one(*job)))
+
+    done = 0
+    printed = 0
+    last_print = 0.0
+    last_pair = None
+    pbar = tqdm(total=0, unit="archivo") if tqdm is not None else None
+    refill()
+    while pending:
+        if pbar is not None and pbar.total != stats["tasks"]:
+            pbar.total = stats["tasks"]
+            pbar.refresh()
+        finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        pending -= finished
+        for fut in finished:
+            for pairs, returncode, err, exc in fut.result():
+                if exc is not None:
+                    for src, dst in pairs:
+                        log_error(f"  Error inesperado: {src} -> {dst} | {exc!r}")
+                elif returncode != 0:
+                    for src, dst in pairs:
+                        log_error(f"  Error al convertir: {src} -> {dst}")
+                    if err:
+                        log_error("  FFmpeg dice:\n " + err.decode("utf-8", "replace").strip())
+                    else:
+                        log_error("  (FFmpeg no devolvió detalles)")
+
+                done += len(pairs)
+                last_pair = pairs[-1]
+                if pbar is not None:
+                    pbar.update(len(pairs))
+                    continue
+                now = time.monotonic()
+                if now - last_print >= PROGRESS_INTERVAL:
+                    last_print = now
+                    printed = done
+                    print(f"[{done}/{stats['tasks']}] {describe(*last_pair)}")
+        refill()
+
+    if pbar is not None:
+        pbar.close()
+    elif last_pair is not None and printed != done:
+        print(f"[{done}/{stats['tasks']}] {describe(*last_pair)}")
+
 def main():
     parser = argparse.ArgumentParser(description="Convierte audios en lote con FFmpeg.")
     parser.add_argument("--input", "-i", required=True, help="Carpeta de entrada (recursivo).")
@@ -125,14 +427,29 @@ def main():
     parser.add_argument("--bitrate", "-b", default=None, help="Bitrate (ej: 128k, 192k, 256k).")
     parser.add_argument("--samplerate", "-r", type=int, default=None, help="Frecuencia de muestreo (ej: 44100, 48000, 8000).")
     parser.add_argument("--channels", "-c", type=int, choices=[1, 2], default=None, help="Canales (1=mono, 2=stereo).")
-    parser.add_argument("--normalize", action="store_true", help="Normaliza volumen (loudnorm EBU R128).")
+    parser.add_argument("--normalize", action="store_true", help="Normaliza volumen (loudnorm EBU R128; igual a --normalize-mode ebu).")
+    parser.add_argument("--normalize-mode", choices=["off", "fast", "ebu"], default="off",
+                        help="Normalización: off, fast (dynaudnorm, rápida) o ebu (loudnorm EBU R128).")
     parser.add_argument("--overwrite", action="store_true", help="Reemplazar si ya existe el archivo destino.")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Conversiones simultáneas (por defecto: núcleos de CPU).")
+    parser.add_argument("--ffmpeg-threads", type=int, default=1,
+                        help="Hilos internos de cada FFmpeg (por defecto 1; 0 = automático).")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="Archivos por invocación de FFmpeg (agrupados por formato destino). "
+                             "Útil con muchos clips cortos; 1 = un FFmpeg por archivo. "
+                             "Con más de 1 no se intenta la copia directa (-c:a copy).")
     parser.add_argument("--dry-run", action="store_true", help="Muestra los comandos sin ejecutar FFmpeg.")
     parser.add_argument("--ffmpeg", default=None, help="Ruta al ejecutable de FFmpeg (ej: C:/ffmpeg/bin/ffmpeg.exe).")
     parser.add_argument("--telephony", action="store_true",
                         help="Atajo para audio de telefonía: WAV PCM 16-bit, 8 kHz, mono (equivale a -f wav -r 8000 -c 1).")
+    parser.add_argument("--inproc", action="store_true",
+                        help="Con --telephony, genera los WAV en proceso con soundfile+soxr, sin lanzar FFmpeg "
+                             "(requiere: pip install soundfile soxr). Si un archivo no se puede leer, usa FFmpeg.")
 
     args = parser.parse_args()
+    if args.normalize and args.normalize_mode == "off":
+        args.normalize_mode = "ebu"
 
     ffmpeg_bin = resolve_ffmpeg(args.ffmpeg)
     check_ffmpeg_available(ffmpeg_bin)
@@ -156,60 +473,137 @@ def main():
         if args.channels is None:
             args.channels = 1
 
-    # Buscar archivos de audio recursivamente
-    audio_files = [p for p in in_dir.rglob("*") if p.is_file() and p.suffix.lower() in SUPPORTED_INPUTS]
-    if not audio_files:
+    # Opciones de salida por formato, armadas una sola vez para toda la corrida
+    head = ffmpeg_head(ffmpeg_bin, args)
+    threads = threads_opts(args)
+    in_opts = threads
+    af_args = ["-af", NORMALIZE_FILTERS[args.normalize_mode]] if args.normalize_mode != "off" else []
+    # Sample rate y canales (sin filtros problemáticos)
+    rate_args = []
+    if args.samplerate: rate_args += ["-ar", str(args.samplerate)]
+    if args.channels:   rate_args += ["-ac", str(args.channels)]
+    out_opts = {ext: [*threads, *af_args, *codec_opts(ext, args.bitrate), *rate_args] for ext in targets}
+
+    # Copia directa (-c:a copy) si el origen ya es del formato destino con el mismo
+    # códec/sample rate/canales: sin normalización ni bitrate que respetar.
+    # Con --batch no se intenta: cada candidato costaría un ffprobe y saldría del lote.
+    copy_specs: dict[str, tuple[str, int | None, int | None]] = {}
+    ffprobe_bin = None
+    if args.normalize_mode == "off" and args.batch <= 1:
+        for ext in targets:
+            if ext in COPY_CODECS and not (args.bitrate and ext in BITRATE_EXTS):
+                copy_specs[ext] = (COPY_CODECS[ext], args.samplerate, args.channels)
+        if copy_specs:
+            ffprobe_bin = resolve_ffprobe(ffmpeg_bin)
+            if ffprobe_bin is None:
+                copy_specs.clear()
+
+    # Telefonía sin FFmpeg: solo WAV mono sin normalizar (lo demás va por FFmpeg)
+    use_inproc = False
+    if args.inproc:
+        if sf is None or soxr is None:
+            print("[Aviso] --inproc requiere 'soundfile' y 'soxr' (pip install soundfile soxr); se usará FFmpeg.")
+        elif not args.telephony:
+            print("[Aviso] --inproc solo aplica junto con --telephony; se usará FFmpeg.")
+        else:
+            use_inproc = args.channels == 1 and args.normalize_mode == "off"
+            if not use_inproc:
+                print("[Aviso] --inproc solo aplica a salida mono sin normalizar; se usará FFmpeg.")
+
+    # Con --overwrite no hace falta consultar el disco por cada destino
+    if args.overwrite:
+        should_skip = lambda d: False
+    else:
+        should_skip = os.path.exists
+
+    # Raíz de salida por formato, calculada una sola vez: <out_dir>/<formato>
+    ext_roots = {ext: os.path.join(str(out_dir), ext.lstrip(".")) for ext in targets}
+    # iter_audio devuelve rutas que empiezan literalmente con in_dir (ya resuelta),
+    # así que la ruta relativa es quitar el prefijo
+    in_prefix = os.path.join(str(in_dir), "")
+    stats = {"files": 0, "tasks": 0}
+
+    def gen_jobs() -> Iterator[Job]:
+        """Recorre la entrada y va entregando trabajos a medida que los encuentra."""
+        made_dirs: set[str] = set()
+        # Destinos ya asignados: "c.mp3" y "c.ogg" de la misma carpeta darían el mismo
+        # "c.wav"; solo se convierte el primero (dos FFmpeg no deben escribir a la vez)
+        claimed: set[str] = set()
+        by_ext: dict[str, list[tuple[str, str]]] = {}
+        for src in iter_audio(str(in_dir), exclude=str(out_dir)):
+            stats["files"] += 1
+            assert src.startswith(in_prefix)
+            stem = os.path.splitext(src.removeprefix(in_prefix))[0]
+            for ext in targets:
+                dst = ext_roots[ext] + os.sep + stem + ext
+                if should_skip(dst):
+                    continue
+                if dst in claimed:
+                    log_error(f"[Aviso] Destino repetido, se omite: {src} -> {dst}")
+                    continue
+                claimed.add(dst)
+                # Una sola creación por carpeta destino, no una por archivo
+                parent = os.path.dirname(dst)
+                if parent not in made_dirs:
+                    try:
+                        os.makedirs(parent, exist_ok=True)
+                    except OSError as e:
+                        # Sin abortar: hay FFmpeg en curso con otros archivos
+                        log_error(f"  No se pudo crear la carpeta destino: {src} -> {dst} | {e!r}")
+                        continue
+                    made_dirs.add(parent)
+                stats["tasks"] += 1
+
+                if use_inproc and ext == ".wav":
+                    # En proceso; el comando FFmpeg queda como respaldo
+                    yield [(src, dst)], build_ffmpeg_cmd(head, in_opts, src, dst, out_opts[ext]), None, args.samplerate
+                elif ext in copy_specs and src[-len(ext):].lower() == ext:
+                    # Candidato a copia directa: va solo, se decide tras ffprobe
+                    cmd = build_ffmpeg_cmd(head, in_opts, src, dst, out_opts[ext])
+                    copy_cmd = build_ffmpeg_cmd(head, in_opts, src, dst, [*threads, "-c:a", "copy"])
+                    yield [(src, dst)], cmd, (copy_specs[ext], copy_cmd), None
+                elif args.batch > 1:
+                    group = by_ext.setdefault(ext, [])
+                    group.append((src, dst))
+                    if len(group) >= args.batch:
+                        yield group, build_ffmpeg_batch_cmd(head, in_opts, group, out_opts[ext]), None, None
+                        by_ext[ext] = []
+                else:
+                    yield [(src, dst)], build_ffmpeg_cmd(head, in_opts, src, dst, out_opts[ext]), None, None
+        for ext, group in by_ext.items():
+            if group:
+                yield group, build_ffmpeg_batch_cmd(head, in_opts, group, out_opts[ext]), None, None
+
+    def single_cmd(src: str, dst: str) -> list[str]:
+        return build_ffmpeg_cmd(head, in_opts, src, dst, out_opts[os.path.splitext(dst)[1]])
+
+    if args.dry_run:
+        done = 0
+        for pairs, cmd, copy, inproc in gen_jobs():
+            for src, dst in pairs:
+                done += 1
+                print(f"[{done}] {describe(src, dst)}")
+            if inproc is not None:
+                print(f"  En proceso (soundfile+soxr, {inproc} Hz mono); si falla:")
+            print("  CMD:", " ".join(cmd))
+            if copy is not None:
+                print("  (si el origen ya coincide):", " ".join(copy[1]))
+    else:
+        # uvloop.run crea su propio loop; sin uvloop, el loop por defecto
+        # (Proactor en Windows, con soporte de subprocesos)
+        runner = uvloop.run if uvloop is not None else asyncio.run
+        runner(run_all(gen_jobs(), args.jobs, ffprobe_bin, stats, single_cmd))
+
+    if not stats["files"]:
         print("No se encontraron archivos de audio en:", in_dir)
         return
 
-    total_jobs = 0
-    for src in audio_files:
-        rel = src.relative_to(in_dir)
-        for ext in targets:
-            dst = out_dir / ext.lstrip(".") / rel.with_suffix(ext)
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            if dst.exists() and not args.overwrite:
-                continue
-            total_jobs += 1
-
-    print(f"Archivos encontrados: {len(audio_files)}")
-    print(f"Tareas a ejecutar:    {total_jobs}")
-    if total_jobs == 0:
+    print(f"Archivos encontrados: {stats['files']}")
+    print(f"Tareas procesadas:    {stats['tasks']}")
+    if stats["tasks"] == 0:
         print("Nada por hacer (posiblemente todo ya convertido).")
         return
 
-    done = 0
-    for src in audio_files:
-        rel = src.relative_to(in_dir)
-        for ext in targets:
-            dst = out_dir / ext.lstrip(".") / rel.with_suffix(ext)
-            if dst.exists() and not args.overwrite:
-                continue
-
-            cmd = build_ffmpeg_cmd(ffmpeg_bin, src, dst, args)
-
-            print(f"[{done+1}/{total_jobs}] {src.name} -> {dst.suffix[1:].upper()}  ({dst})")
-            if args.dry_run:
-                print("  CMD:", " ".join(cmd))
-            else:
-                try:
-                    result = subprocess.run(
-                        cmd,
-                        check=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True
-                    )
-                except subprocess.CalledProcessError as e:
-                    print("  Error al convertir:", src, "->", dst)
-                    if e.stderr:
-                        print("  FFmpeg dice:\n", e.stderr.strip())
-                    else:
-                        print("  (FFmpeg no devolvió detalles)")
-                except Exception as e:
-                    print("  Error inesperado:", src, "->", dst, "|", repr(e))
-            done += 1
-
     print("Proceso finalizado.")
 
 if __name__ == "__main__":